@@ -1,7 +1,9 @@
 """
 Calculator (safe, single-file)
 --------------------------------
-A simple calculator that evaluates math expressions safely (no eval).
+A simple calculator that evaluates math expressions safely: each expression
+is parsed and checked against a whitelist of operators, functions and names,
+then compiled and run by eval() with no builtins in scope.
 - Supports: +, -, *, /, //, %, **, parentheses, unary +/-, and comparisons (==, !=, <, <=, >, >=)
 - Functions: abs, round, sqrt, sin, cos, tan, log, log10, exp, pow, max, min
 - Constants: pi, e, tau
@@ -24,10 +26,23 @@ Examples:
 """
 
 import ast
+import copy
+import functools
+import keyword
 import operator as op
 import math
 import sys
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # only SafeEval.eval_vectorized needs NumPy
+    np = None
+
+try:
+    import numba
+except ImportError:  # SafeEval.jit then returns plain Python functions
+    numba = None
 
 # Supported operators mapping
 _BIN_OPS = {
@@ -75,123 +90,734 @@ _ALLOWED_CONSTS = {
     "tau": math.tau,
 }
 
-class SafeEval(ast.NodeVisitor):
-    def __init__(self, variables: Dict[str, Any] | None = None):
-        self.vars = {} if variables is None else dict(variables)
+# Name sets for membership tests; string hashes are cached on the interned ids
+_ALLOWED_FUNC_NAMES = frozenset(_ALLOWED_FUNCS)
+_ALLOWED_CONST_NAMES = frozenset(_ALLOWED_CONSTS)
 
-    def eval(self, expr: str) -> Any:
-        try:
-            tree = ast.parse(expr, mode="exec")
-        except SyntaxError as e:
-            raise ValueError(f"Syntax error: {e.msg}") from None
-        # Allow either a single expression or assignment statements
-        if not tree.body:
-            return None
-        if len(tree.body) == 1 and isinstance(tree.body[0], ast.Expr):
-            return self._eval_expr(tree.body[0].value)
+# Default for a name that is neither a variable nor an allowed constant
+_MISSING = object()
+
+# Constant value types an expression may contain
+_NUMERIC_TYPES = frozenset({int, float, bool})
+
+class _Rewriter:
+    """Post-order AST rewrite without recursion, so deep trees such as long
+    sums cost no Python stack. visit_<Class>(node) methods see the node's
+    children already rewritten and return its replacement. With copy=True
+    every node is shallow-copied first, leaving the input tree untouched."""
+
+    copy = False
+
+    def rewrite(self, root: ast.AST) -> ast.AST:
+        pending: List[Tuple[ast.AST, Optional[int]]] = [(root, None)]
+        done: List[ast.AST] = []
+        while pending:
+            node, count = pending.pop()
+            if count is None:
+                children = list(ast.iter_child_nodes(node))
+                pending.append((node, len(children)))
+                pending.extend((child, None) for child in reversed(children))
+                continue
+            results = iter(done[len(done) - count:])
+            del done[len(done) - count:]
+            if self.copy:
+                node = copy.copy(node)
+            for field, value in ast.iter_fields(node):
+                if isinstance(value, ast.AST):
+                    setattr(node, field, next(results))
+                elif isinstance(value, list):
+                    setattr(node, field, [next(results) if isinstance(v, ast.AST) else v for v in value])
+            visit = getattr(self, "visit_" + type(node).__name__, None)
+            done.append(node if visit is None else visit(node))
+        return done[0]
+
+class _Preparer(_Rewriter):
+    """Resolve operators, names and calls onto their nodes, rejecting disallowed
+    ones, and fold literal subtrees the evaluators would otherwise recompute."""
+
+    def __init__(self):
+        # Stays True while no names (so no variables, calls or assignments) are seen
+        self.pure = True
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        # Dunder names would reach eval()'s own globals, such as __builtins__
+        if node.id.startswith("__"):
+            raise ValueError(f"Invalid variable name: {node.id}")
+        self.pure = False
+        # Variables may shadow constants, so a constant becomes the lookup
+        # default rather than being folded into the tree.
+        node.id = node._var_key = sys.intern(node.id)
+        node._default = _ALLOWED_CONSTS[node.id] if node.id in _ALLOWED_CONST_NAMES else _MISSING
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        op_type = type(node.op)
+        if op_type not in _BIN_OPS:
+            raise ValueError(f"Operator not allowed: {op_type.__name__}")
+        node._op_fn = _BIN_OPS[op_type]
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        op_type = type(node.op)
+        if op_type not in _UNARY_OPS:
+            raise ValueError(f"Unary operator not allowed: {op_type.__name__}")
+        node._op_fn = _UNARY_OPS[op_type]
+        operand = node.operand
+        # -1.5 parses as USub(Constant(1.5)); fold it into a single literal
+        if op_type is ast.USub and type(operand) is ast.Constant and type(operand.value) in (int, float):
+            return ast.copy_location(ast.Constant(value=-operand.value), node)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        if any(type(o) not in _CMP_OPS for o in node.ops):
+            raise ValueError("Comparison operator not allowed.")
+        node._op_fns = tuple(_CMP_OPS[type(o)] for o in node.ops)
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        # A literal equal to the absorbing value (False for and, True for or)
+        # decides the result once the operands before it have been evaluated
+        # (they may still raise); any other literal cannot change it.
+        absorbing = isinstance(node.op, ast.Or)
+        values = []
+        for value in node.values:
+            if type(value) is ast.Constant and isinstance(value.value, (int, float, bool)):
+                if bool(value.value) is absorbing:
+                    if not values:
+                        return ast.copy_location(ast.Constant(value=absorbing), node)
+                    values.append(value)
+                    break
+            else:
+                values.append(value)
+        if not values:
+            return ast.copy_location(ast.Constant(value=not absorbing), node)
+        if len(values) == 1 and type(values[0]) in (ast.Compare, ast.BoolOp):
+            return values[0]  # already True/False
+        # A single remaining operand keeps its BoolOp, which coerces it to bool
+        node.values = values
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not isinstance(node.func, ast.Name):
+            raise ValueError("Only direct function calls are allowed.")
+        func_name = node.func.id = sys.intern(node.func.id)
+        if func_name not in _ALLOWED_FUNC_NAMES:
+            raise ValueError(f"Function not allowed: {func_name}")
+        if node.keywords:
+            raise ValueError("Keyword arguments are not allowed.")
+        node._fn = _ALLOWED_FUNCS[func_name]
+        node.func._callee = True  # a function, not a variable reference
+        return node
+
+def _prepare(tree: ast.Module) -> ast.Module:
+    preparer = _Preparer()
+    tree = preparer.rewrite(tree)
+    tree._pure = preparer.pure
+    return tree
+
+@functools.lru_cache(maxsize=256)
+def _parse_cached(expr: str) -> ast.Module:
+    # The returned tree is shared between callers: it is annotated once by
+    # _prepare here and must never be mutated afterwards.
+    return _prepare(ast.parse(expr, mode="exec"))
+
+@functools.lru_cache(maxsize=256)
+def _parse_statements(expr: str) -> Tuple[Tuple[Optional[str], ast.expr], ...]:
+    """Parse expr into (target, value) pairs, where target is the assigned
+    variable name or None for a bare expression."""
+    try:
+        tree = _parse_cached(expr)
+    except SyntaxError as e:
+        raise ValueError(f"Syntax error: {e.msg}") from None
+    statements = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            if len(node.targets) != 1:
+                raise ValueError("Only single-target assignment is allowed.")
+            target = node.targets[0]
+            if not isinstance(target, ast.Name):
+                raise ValueError("Can only assign to variable names.")
+            statements.append((target._var_key, node.value))
+        elif isinstance(node, ast.Expr):
+            statements.append((None, node.value))
         else:
-            # permit simple assignments: a = <expr>, possibly multiple lines separated by semicolons/newlines
-            last_value = None
-            for node in tree.body:
-                if isinstance(node, ast.Assign):
-                    if len(node.targets) != 1:
-                        raise ValueError("Only single-target assignment is allowed.")
-                    target = node.targets[0]
-                    if not isinstance(target, ast.Name):
-                        raise ValueError("Can only assign to variable names.")
-                    value = self._eval_expr(node.value)
-                    self.vars[target.id] = value
-                    last_value = value
-                elif isinstance(node, ast.Expr):
-                    last_value = self._eval_expr(node.value)
-                else:
-                    raise ValueError("Only expressions and simple assignments are allowed.")
-            return last_value
+            raise ValueError("Only expressions and simple assignments are allowed.")
+    return tuple(statements)
 
-    def _eval_expr(self, node: ast.AST) -> Any:
-        if isinstance(node, ast.Constant):  # numbers, booleans
+_EXPR_TYPES = frozenset({
+    ast.Constant, ast.Name, ast.BinOp, ast.UnaryOp, ast.Call,
+    ast.Compare, ast.BoolOp, ast.IfExp, ast.Tuple,
+})
+
+def _check_expr(node: ast.AST) -> None:
+    """Reject what SafeEval would reject on evaluating any branch of node."""
+    for child in ast.walk(node):
+        if not isinstance(child, ast.expr):
+            continue  # operators and contexts, already checked by _prepare
+        if type(child) not in _EXPR_TYPES:
+            raise ValueError(f"Unsupported expression: {type(child).__name__}")
+        if type(child) is ast.Constant and not isinstance(child.value, (int, float, bool)):
+            raise ValueError("Only numeric and boolean constants are allowed.")
+
+# Callees are renamed to keys no parsed identifier can spell, so a user
+# variable such as `sqrt = 4` cannot shadow the function in the code below.
+_CODEGEN_GLOBALS = {
+    "__builtins__": {},
+    "<bool>": bool,
+    **{f"<{name}>": fn for name, fn in _ALLOWED_FUNCS.items()},
+    **_ALLOWED_CONSTS,
+}
+
+class _Lowering(_Rewriter):
+    """Copying rewrite shared by the code generators; bool_name is the name
+    bool() is reachable under in the generated code."""
+
+    copy = True
+    bool_name = "bool"
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        # and/or yield True/False in SafeEval, not the deciding operand
+        values = []
+        for value in node.values:
+            func = ast.copy_location(ast.Name(id=self.bool_name, ctx=ast.Load()), value)
+            values.append(ast.copy_location(ast.Call(func=func, args=[value], keywords=[]), value))
+        node.values = values
+        return node if len(values) > 1 else values[0]
+
+class _CodegenLowering(_Lowering):
+    """Rewrite a copy of a prepared expression for CPython's compile()."""
+
+    bool_name = "<bool>"
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        node.func = ast.copy_location(ast.Name(id=f"<{node.func.id}>", ctx=ast.Load()), node.func)
+        return node
+
+@functools.lru_cache(maxsize=256)
+def _codegen_cached(expr: str) -> Tuple[Tuple[Tuple[str | None, Any], ...], bool]:
+    """Validate expr and compile each statement to CPython bytecode.
+
+    Returns (target, code) pairs, where target is the assigned variable name
+    or None for a bare expression, and whether expr is free of names.
+    """
+    statements = []
+    for target, value in _parse_statements(expr):
+        _check_expr(value)
+        body = _CodegenLowering().rewrite(value)
+        statements.append((target, compile(ast.Expression(body=body), "<calc>", "eval")))
+    return tuple(statements), _parse_cached(expr)._pure
+
+@functools.lru_cache(maxsize=256)
+def _eval_pure(expr: str) -> Any:
+    """Value of an input without names, which is the same on every call."""
+    last_value = None
+    for _, code in _codegen_cached(expr)[0]:
+        last_value = eval(code, _CODEGEN_GLOBALS, {})
+    return last_value
+
+# Bytecode for compiled programs: a flat list of (opcode, arg) int pairs.
+# Jump arguments are relative to the instruction that follows the jump.
+_LOAD_CONST = 0
+_LOAD_VAR = 1
+_STORE_VAR = 2
+_POP = 3
+_BINOP = 4
+_UNARYOP = 5
+_CALL = 6
+_CMP = 7
+_CMP_CHAIN = 8
+_JUMP = 9
+_JUMP_IF_FALSE = 10
+_JUMP_IF_TRUE = 11
+_BUILD_TUPLE = 12
+# x ** 2 and x ** 3 as plain multiplications for ints, where they are exact.
+# Anything else goes through pow: a float product can overflow to inf where
+# pow raises OverflowError, and can differ from it in the last bit.
+_SQUARE = 13
+_CUBE = 14
+
+# Operator tables indexed by the BINOP/UNARYOP/CMP argument
+_BIN_OP_FNS = tuple(_BIN_OPS.values())
+_UNARY_OP_FNS = tuple(_UNARY_OPS.values())
+_CMP_OP_FNS = tuple(_CMP_OPS.values())
+
+
+class Program:
+    """An expression compiled by SafeEval.compile, run with SafeEval.run."""
+
+    __slots__ = ("source", "code", "consts", "names", "defaults", "calls")
+
+    def __init__(self, source: str, code: List[int], consts: List[Any], names: List[str],
+                 defaults: List[Any], calls: List[Tuple[Callable[..., Any], int]]):
+        self.source = source
+        self.code = code
+        self.consts = consts
+        self.names = names
+        self.defaults = defaults
+        self.calls = calls
+
+    def __repr__(self) -> str:
+        return f"Program({self.source!r})"
+
+
+class _Compiler:
+    """Single AST pass emitting Program bytecode, folding constant subexpressions."""
+
+    def __init__(self):
+        self.consts: List[Any] = []
+        self.names: List[str] = []
+        self.defaults: List[Any] = []
+        self.calls: List[Tuple[Callable[..., Any], int]] = []
+
+    def module(self, statements: Tuple[Tuple[Optional[str], ast.expr], ...]) -> List[int]:
+        if not statements:
+            return self._const(None)
+        code: List[int] = []
+        for i, (target, value) in enumerate(statements):
+            if i:
+                code += [_POP, 0]
+            code += self.expr(value)
+            if target is not None:
+                code += [_STORE_VAR, self._name(target)]
+        return code
+
+    def expr(self, node: ast.AST) -> List[int]:
+        if isinstance(node, ast.Constant):
             if isinstance(node.value, (int, float, bool)):
-                return node.value
+                return self._const(node.value)
             raise ValueError("Only numeric and boolean constants are allowed.")
         if isinstance(node, ast.Name):
-            if node.id in self.vars:
-                return self.vars[node.id]
-            if node.id in _ALLOWED_CONSTS:
-                return _ALLOWED_CONSTS[node.id]
-            raise ValueError(f"Unknown variable or constant: {node.id}")
+            return [_LOAD_VAR, self._name(node._var_key)]
         if isinstance(node, ast.BinOp):
-            left = self._eval_expr(node.left)
-            right = self._eval_expr(node.right)
-            op_type = type(node.op)
-            if op_type in _BIN_OPS:
-                return _BIN_OPS[op_type](left, right)
-            raise ValueError(f"Operator not allowed: {op_type.__name__}")
+            left = self.expr(node.left)
+            right = self.expr(node.right)
+            if node._op_fn is op.pow and self._const_value(left) is None:
+                exponent = self._const_value(right)
+                if exponent is not None and type(exponent[0]) is int and exponent[0] in (2, 3):
+                    return left + [_SQUARE if exponent[0] == 2 else _CUBE, 0]
+            return self._fold([left, right], node._op_fn, [_BINOP, _BIN_OP_FNS.index(node._op_fn)])
         if isinstance(node, ast.UnaryOp):
-            operand = self._eval_expr(node.operand)
-            op_type = type(node.op)
-            if op_type in _UNARY_OPS:
-                return _UNARY_OPS[op_type](operand)
-            raise ValueError(f"Unary operator not allowed: {op_type.__name__}")
+            operand = self.expr(node.operand)
+            return self._fold([operand], node._op_fn, [_UNARYOP, _UNARY_OP_FNS.index(node._op_fn)])
         if isinstance(node, ast.Call):
-            if not isinstance(node.func, ast.Name):
-                raise ValueError("Only direct function calls are allowed.")
-            func_name = node.func.id
-            if func_name not in _ALLOWED_FUNCS:
-                raise ValueError(f"Function not allowed: {func_name}")
-            args = [self._eval_expr(a) for a in node.args]
-            if node.keywords:
-                raise ValueError("Keyword arguments are not allowed.")
-            return _ALLOWED_FUNCS[func_name](*args)
+            args = [self.expr(a) for a in node.args]
+            folded = self._folded(args, node._fn)
+            if folded is not None:
+                return folded
+            # Only calls left in the bytecode get an entry in calls
+            self.calls.append((node._fn, len(args)))
+            return self._emit(args, [_CALL, len(self.calls) - 1])
         if isinstance(node, ast.Compare):
-            if len(node.ops) != 1 or len(node.comparators) != 1:
-                # Support chained comparisons by folding
-                left_val = self._eval_expr(node.left)
-                result = True
-                current_left = left_val
-                for op_node, comp_node in zip(node.ops, node.comparators):
-                    right_val = self._eval_expr(comp_node)
-                    op_type = type(op_node)
-                    if op_type not in _CMP_OPS:
-                        raise ValueError("Comparison operator not allowed.")
-                    if not _CMP_OPS[op_type](current_left, right_val):
-                        result = False
-                        break
-                    current_left = right_val
-                return result
-            # Simple binary comparison
-            left = self._eval_expr(node.left)
-            right = self._eval_expr(node.comparators[0])
-            op_type = type(node.ops[0])
-            if op_type in _CMP_OPS:
-                return _CMP_OPS[op_type](left, right)
-            raise ValueError("Comparison operator not allowed.")
+            left = self.expr(node.left)
+            parts = [self.expr(c) for c in node.comparators]
+            idxs = [_CMP_OP_FNS.index(fn) for fn in node._op_fns]
+            if len(parts) == 1:
+                return self._fold([left, parts[0]], node._op_fns[0], [_CMP, idxs[0]])
+            # Chained comparisons: CMP_CHAIN leaves (right, True) on success so the
+            # following JUMP_IF_FALSE falls through, or (False, False) on failure.
+            # Emit from the end so each jump knows the distance to the end.
+            code = parts[-1] + [_CMP, idxs[-1]]
+            for part, idx in zip(reversed(parts[:-1]), reversed(idxs[:-1])):
+                code = part + [_CMP_CHAIN, idx, _JUMP_IF_FALSE, len(code)] + code
+            return left + code
         if isinstance(node, ast.BoolOp):
-            # handle 'and'/'or'
             if isinstance(node.op, ast.And):
-                for v in node.values:
-                    if not self._eval_expr(v):
-                        return False
-                return True
-            if isinstance(node.op, ast.Or):
-                for v in node.values:
-                    if self._eval_expr(v):
-                        return True
-                return False
-            raise ValueError("Boolean operator not allowed.")
+                jump, short_value = _JUMP_IF_FALSE, False
+            elif isinstance(node.op, ast.Or):
+                jump, short_value = _JUMP_IF_TRUE, True
+            else:
+                raise ValueError("Boolean operator not allowed.")
+            # Each operand jumps to the short-circuit result; falling through
+            # every operand yields the opposite value.
+            short = self._const(short_value)
+            tail = self._const(not short_value) + [_JUMP, len(short)]
+            parts = [self.expr(v) for v in node.values]
+            code: List[int] = []
+            for i, part in enumerate(parts):
+                rest = sum(len(p) + 2 for p in parts[i + 1:])
+                code += part + [jump, rest + len(tail)]
+            return code + tail + short
         if isinstance(node, ast.IfExp):
-            return self._eval_expr(node.body) if self._eval_expr(node.test) else self._eval_expr(node.orelse)
+            test = self.expr(node.test)
+            folded = self._const_value(test)
+            if folded is not None:
+                # Compile only the branch taken, so the other adds no consts or
+                # names; it is still validated like every other branch.
+                taken, skipped = (node.body, node.orelse) if folded[0] else (node.orelse, node.body)
+                _check_expr(skipped)
+                return self.expr(taken)
+            body = self.expr(node.body)
+            orelse = self.expr(node.orelse)
+            body += [_JUMP, len(orelse)]
+            return test + [_JUMP_IF_FALSE, len(body)] + body + orelse
         if isinstance(node, ast.Tuple):
-            return tuple(self._eval_expr(elt) for elt in node.elts)
+            elts = [self.expr(elt) for elt in node.elts]
+            return self._fold(elts, lambda *items: items, [_BUILD_TUPLE, len(elts)])
         raise ValueError(f"Unsupported expression: {type(node).__name__}")
 
+    def _const(self, value: Any) -> List[int]:
+        self.consts.append(value)
+        return [_LOAD_CONST, len(self.consts) - 1]
+
+    def _const_value(self, code: List[int]) -> Tuple[Any] | None:
+        if len(code) == 2 and code[0] == _LOAD_CONST:
+            return (self.consts[code[1]],)
+        return None
+
+    def _folded(self, operands: List[List[int]], fn: Callable[..., Any]) -> List[int] | None:
+        values = [self._const_value(o) for o in operands]
+        if all(v is not None for v in values):
+            try:
+                return self._const(fn(*(v[0] for v in values)))
+            except Exception:
+                pass  # leave it for run time so the error surfaces there
+        return None
+
+    def _fold(self, operands: List[List[int]], fn: Callable[..., Any], instr: List[int]) -> List[int]:
+        folded = self._folded(operands, fn)
+        return self._emit(operands, instr) if folded is None else folded
+
+    def _emit(self, operands: List[List[int]], instr: List[int]) -> List[int]:
+        code: List[int] = []
+        for o in operands:
+            code += o
+        return code + instr
+
+    def _name(self, key: str) -> int:
+        if key not in self.names:
+            self.names.append(key)
+            self.defaults.append(_ALLOWED_CONSTS.get(key, _MISSING))
+        return self.names.index(key)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_cached(expr: str) -> Program:
+    compiler = _Compiler()
+    code = compiler.module(_parse_statements(expr))
+    return Program(expr, code, compiler.consts, compiler.names, compiler.defaults, compiler.calls)
+
+class SafeEval(ast.NodeVisitor):
+    def __init__(self, variables: Dict[str, Any] | None = None):
+        self.vars = {} if variables is None else dict(variables)
+
+    def eval(self, expr: str) -> Any:
+        statements, pure = _codegen_cached(expr)
+        if pure:
+            return _eval_pure(expr)
+        variables = self.vars
+        last_value = None
+        for target, code in statements:
+            # Variables are the locals, so they shadow the constants in globals
+            try:
+                last_value = eval(code, _CODEGEN_GLOBALS, variables)
+            except NameError as e:
+                raise ValueError(f"Unknown variable or constant: {e.name}") from None
+            if target is not None:
+                variables[target] = last_value
+        return last_value
+
+    def eval_vectorized(self, expr: str, env: Dict[str, "np.ndarray"]) -> "np.ndarray":
+        """Evaluate expr once over whole arrays, e.g. x**2 + y**2 at 10k points.
+
+        Variables in env (arrays or scalars) take precedence over this
+        evaluator's variables; assignments stay local to the call. Every
+        branch of and/or/if-else is evaluated, then combined element-wise.
+        The result has the broadcast shape of the env arrays even when expr
+        folds to a constant.
+        """
+        if np is None:
+            raise RuntimeError("eval_vectorized requires NumPy.")
+        if any(type(value) is ast.Tuple for _, value in _parse_statements(expr)):
+            raise ValueError("Tuple results cannot be vectorized.")
+        variables = dict(self.vars)
+        variables.update((name, np.asarray(value)) for name, value in env.items())
+        result = np.asarray(_VectorEval(variables).eval(expr))
+        shape = np.broadcast_shapes(result.shape, *(variables[name].shape for name in env))
+        if result.shape != shape:
+            result = np.broadcast_to(result, shape).copy()
+        return result
+
+    def jit(self, expr: str, var_names: Tuple[str, ...]) -> Callable[..., Any]:
+        """Compile expr to a native function of var_names, e.g.
+        jit("x**2 + y**2", ("x", "y"))(3, 4) == 25.
+
+        Uses numba when it is installed and a plain Python function otherwise.
+        """
+        return _jit_cached(expr, tuple(var_names))
+
+    def compile(self, expr: str) -> Program:
+        """Compile expr once for repeated evaluation with run()."""
+        return _compile_cached(expr)
+
+    def run(self, program: Program) -> Any:
+        code = program.code
+        consts = program.consts
+        names = program.names
+        calls = program.calls
+        variables = self.vars
+        # One lookup per distinct name; LOAD_VAR/STORE_VAR then use slot indexes
+        slots = [variables.get(name, default) for name, default in zip(names, program.defaults)]
+        stack: List[Any] = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        end = len(code)
+        while pc < end:
+            opcode = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+            if opcode == _LOAD_VAR:
+                value = slots[arg]
+                if value is _MISSING:
+                    raise ValueError(f"Unknown variable or constant: {names[arg]}")
+                push(value)
+            elif opcode == _LOAD_CONST:
+                push(consts[arg])
+            elif opcode == _BINOP:
+                right = pop()
+                stack[-1] = _BIN_OP_FNS[arg](stack[-1], right)
+            elif opcode == _SQUARE:
+                x = stack[-1]
+                stack[-1] = x * x if type(x) is int else x ** 2
+            elif opcode == _CUBE:
+                x = stack[-1]
+                stack[-1] = x * x * x if type(x) is int else x ** 3
+            elif opcode == _UNARYOP:
+                stack[-1] = _UNARY_OP_FNS[arg](stack[-1])
+            elif opcode == _CALL:
+                fn, nargs = calls[arg]
+                if nargs == 1:
+                    stack[-1] = fn(stack[-1])
+                    continue
+                if nargs:
+                    args = stack[-nargs:]
+                    del stack[-nargs:]
+                else:
+                    args = []
+                push(fn(*args))
+            elif opcode == _CMP:
+                right = pop()
+                stack[-1] = _CMP_OP_FNS[arg](stack[-1], right)
+            elif opcode == _CMP_CHAIN:
+                right = pop()
+                if _CMP_OP_FNS[arg](stack[-1], right):
+                    stack[-1] = right
+                    push(True)
+                else:
+                    stack[-1] = False
+                    push(False)
+            elif opcode == _JUMP_IF_FALSE:
+                if not pop():
+                    pc += arg
+            elif opcode == _JUMP_IF_TRUE:
+                if pop():
+                    pc += arg
+            elif opcode == _JUMP:
+                pc += arg
+            elif opcode == _STORE_VAR:
+                slots[arg] = variables[names[arg]] = stack[-1]
+            elif opcode == _POP:
+                pop()
+            elif opcode == _BUILD_TUPLE:
+                items = tuple(stack[len(stack) - arg:])
+                del stack[len(stack) - arg:]
+                push(items)
+        return stack[-1]
+
+class _JitLowering(_Lowering):
+    """Rewrite a copy of a prepared expression into plain Python source terms."""
+
+    def __init__(self, var_names: Tuple[str, ...]):
+        self.var_names = var_names
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        # Callees refer to _ALLOWED_FUNCS in the generated namespace
+        if node.id in self.var_names or getattr(node, "_callee", False):
+            return node
+        # The variable set is fixed, so constants can be inlined here
+        if node.id in _ALLOWED_CONST_NAMES:
+            return ast.copy_location(ast.Constant(value=_ALLOWED_CONSTS[node.id]), node)
+        raise ValueError(f"Unknown variable or constant: {node.id}")
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        # The prepare pass folds -2 into one literal, which ast.unparse would
+        # write as -2 and so turn (-2) ** 2 into -(2 ** 2)
+        value = node.value
+        if type(value) in (int, float) and math.copysign(1, value) < 0:
+            operand = ast.copy_location(ast.Constant(value=-value), node)
+            return ast.copy_location(ast.UnaryOp(op=ast.USub(), operand=operand), node)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        # numba gives 0 for an int to a negative int power; Python a float
+        right = node.right
+        if (type(node.op) is ast.Pow and type(right) is ast.UnaryOp and type(right.op) is ast.USub
+                and type(right.operand) is ast.Constant and type(right.operand.value) is int):
+            right.operand = ast.copy_location(ast.Constant(value=float(right.operand.value)), right.operand)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if node.func.id == "log" and len(node.args) == 2:
+            # numba only types one-argument log; math.log(x, b) is log(x) / log(b)
+            return ast.BinOp(left=ast.Call(func=node.func, args=node.args[:1], keywords=[]),
+                             op=ast.Div(),
+                             right=ast.Call(func=node.func, args=node.args[1:], keywords=[]))
+        return node
+
+@functools.lru_cache(maxsize=64)
+def _jit_cached(expr: str, var_names: Tuple[str, ...]) -> Callable[..., Any]:
+    for name in var_names:
+        if not name.isidentifier() or keyword.iskeyword(name) or name in _ALLOWED_FUNC_NAMES or name == "bool":
+            raise ValueError(f"Invalid variable name: {name}")
+    if len(set(var_names)) != len(var_names):
+        duplicate = next(name for i, name in enumerate(var_names) if name in var_names[:i])
+        raise ValueError(f"Duplicate variable name: {duplicate}")
+    statements = _parse_statements(expr)
+    if len(statements) != 1 or statements[0][0] is not None:
+        raise ValueError("Only a single expression can be compiled.")
+    value = statements[0][1]
+    # Only nodes SafeEval accepts may reach the generated source
+    _check_expr(value)
+    body = _JitLowering(var_names).rewrite(value)
+    source = f"def _jit_expr({', '.join(var_names)}):\n    return {ast.unparse(body)}\n"
+    namespace = {"__builtins__": {}, "bool": bool, **_ALLOWED_FUNCS}
+    exec(source, namespace)
+    fn = namespace["_jit_expr"]
+    if numba is not None:
+        # numba specializes per argument types itself; cache=True is not
+        # possible because the function has no source file to key on.
+        fn = numba.njit(fn)
+    return fn
+
+def _np_log(x: Any, base: Any = None) -> Any:
+    return np.log(x) if base is None else np.log(x) / np.log(base)
+
+def _np_pow(x: Any, y: Any, mod: Any = None) -> Any:
+    # Integer arrays reject negative integer exponents, where ints give a float
+    if np.issubdtype(np.result_type(y), np.integer) and np.any(np.less(y, 0)):
+        x = np.asarray(x, dtype=float)
+    # np.power's third positional argument is its out array, not a modulus
+    return np.power(x, y) if mod is None else np.power(x, y) % mod
+
+def _np_reduce(ufunc: Any) -> Callable[..., Any]:
+    def reduce(*args: Any) -> Any:
+        if len(args) == 1:  # max((a, b)) like max(a, b)
+            args = tuple(args[0])
+        return functools.reduce(ufunc, args)
+    return reduce
+
+if np is not None:
+    _NUMPY_FUNCS = {
+        "abs": np.abs,
+        "round": np.round,
+        "sqrt": np.sqrt,
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "log": _np_log,
+        "log10": np.log10,
+        "exp": np.exp,
+        "pow": _np_pow,
+        "max": _np_reduce(np.maximum),
+        "min": _np_reduce(np.minimum),
+    }
+
+class _VectorEval:
+    """Tree-walking evaluator over NumPy arrays. The operator callables
+    resolved by the prepare pass already dispatch to NumPy ufuncs; calls and
+    the short-circuiting constructs use element-wise versions."""
+
+    def __init__(self, variables: Dict[str, Any]):
+        self.vars = variables
+        # AST node class -> handler; replaces a chain of isinstance checks
+        self._dispatch = {
+            ast.Constant: self._on_const,
+            ast.Name: self._on_name,
+            ast.BinOp: self._on_binop,
+            ast.UnaryOp: self._on_unaryop,
+            ast.Call: self._on_call,
+            ast.Compare: self._on_compare,
+            ast.BoolOp: self._on_boolop,
+            ast.IfExp: self._on_ifexp,
+            ast.Tuple: self._on_tuple,
+        }
+
+    def eval(self, expr: str) -> Any:
+        variables = self.vars
+        last_value = None
+        for target, value in _parse_statements(expr):
+            last_value = self._eval_expr(value)
+            if target is not None:
+                variables[target] = last_value
+        return last_value
+
+    def _eval_expr(self, node: ast.AST) -> Any:
+        node_type = type(node)
+        # Numeric literals are most leaves: no handler call for them
+        if node_type is ast.Constant and type(node.value) in _NUMERIC_TYPES:
+            return node.value
+        try:
+            handler = self._dispatch[node_type]
+        except KeyError:
+            raise ValueError(f"Unsupported expression: {node_type.__name__}") from None
+        return handler(node)
+
+    def _on_const(self, node: ast.Constant) -> Any:
+        # Numbers and booleans are returned by _eval_expr itself
+        raise ValueError("Only numeric and boolean constants are allowed.")
+
+    def _on_name(self, node: ast.Name) -> Any:
+        value = self.vars.get(node._var_key, node._default)
+        if value is _MISSING:
+            raise ValueError(f"Unknown variable or constant: {node.id}")
+        return value
+
+    def _on_binop(self, node: ast.BinOp) -> Any:
+        if node._op_fn is op.pow:
+            return _np_pow(self._eval_expr(node.left), self._eval_expr(node.right))
+        return node._op_fn(self._eval_expr(node.left), self._eval_expr(node.right))
+
+    def _on_unaryop(self, node: ast.UnaryOp) -> Any:
+        return node._op_fn(self._eval_expr(node.operand))
+
+    def _on_tuple(self, node: ast.Tuple) -> Any:
+        return tuple(self._eval_expr(elt) for elt in node.elts)
+
+    def _on_call(self, node: ast.Call) -> Any:
+        return _NUMPY_FUNCS[node.func.id](*[self._eval_expr(a) for a in node.args])
+
+    def _on_compare(self, node: ast.Compare) -> Any:
+        left = self._eval_expr(node.left)
+        result = True
+        for cmp_fn, comp_node in zip(node._op_fns, node.comparators):
+            right = self._eval_expr(comp_node)
+            result = np.logical_and(result, cmp_fn(left, right))
+            left = right
+        return result
+
+    def _on_boolop(self, node: ast.BoolOp) -> Any:
+        if isinstance(node.op, ast.And):
+            combine, initial = np.logical_and, True
+        else:
+            combine, initial = np.logical_or, False
+        return functools.reduce(combine, [self._eval_expr(v) for v in node.values], initial)
+
+    def _on_ifexp(self, node: ast.IfExp) -> Any:
+        return np.where(self._eval_expr(node.test), self._eval_expr(node.body), self._eval_expr(node.orelse))
+
 HELP_TEXT = __doc__
 
 def repl() -> None:
+    try:
+        import readline  # noqa: F401 -- line editing and history for input()
+    except ImportError:  # not available on Windows
+        pass
     evaluator = SafeEval()
+    strip = str.strip
     print("Safe Calculator — type :help for help, :quit to exit.")
     while True:
         try:
-            line = input(">> ").strip()
+            line = strip(input(">> "))
         except (EOFError, KeyboardInterrupt):
             print("\nBye!")
             break
@@ -1,9 +1,43 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import random
+import secrets
 import string
 import pyperclip
 
+_SYMBOLS = '!@#$%^&*()_+-=[]{}|;:,.<>?'
+
+# Character type partitions, in checkbox order
+_LOWER_B = string.ascii_lowercase.encode('ascii')
+_UPPER_B = string.ascii_uppercase.encode('ascii')
+_DIGIT_B = string.digits.encode('ascii')
+_SYMBOL_B = _SYMBOLS.encode('ascii')
+
+def _make_table(pool):
+    """Build a bytes.translate table mapping random bytes onto pool.
+
+    Bytes at or above the largest multiple of len(pool) are deleted rather
+    than wrapped around, so every pool character stays equally likely.
+    """
+    limit = 256 - 256 % len(pool)
+    table = bytes(pool[b % len(pool)] for b in range(256))
+    return table, bytes(range(limit, 256))
+
+def _random_bytes(table, reject, length):
+    password = b''
+    while len(password) < length:
+        password += secrets.token_bytes(length - len(password)).translate(table, reject)
+    return password
+
+def _random_password(table, reject, parts, length):
+    """Draw a password containing at least one character from each part."""
+    password = bytearray(_random_bytes(table, reject, length - len(parts)))
+    password += bytes(part[secrets.randbelow(len(part))] for part in parts)
+    # Fisher-Yates, so the required characters can end up anywhere
+    for i in range(len(password) - 1, 0, -1):
+        j = secrets.randbelow(i + 1)
+        password[i], password[j] = password[j], password[i]
+    return password.decode('ascii')
+
 class PasswordGeneratorApp:
     def __init__(self, root):
         self.root = root
@@ -11,6 +45,9 @@ class PasswordGeneratorApp:
         self.root.geometry("400x400")
         self.root.resizable(False, False)
         
+        # (table, reject, parts) per (lower, upper, digits, symbols) selection
+        self._pools = {}
+        
         self.create_widgets()  # This will now work because create_widgets is properly indented
     
     def create_widgets(self):
@@ -64,19 +101,24 @@ class PasswordGeneratorApp:
         copy_btn = ttk.Button(self.root, text="Copy to Clipboard", command=self.copy_to_clipboard)
         copy_btn.pack(pady=5)
     
+    def _pool_for(self, selection):
+        pool = self._pools.get(selection)
+        if pool is None:
+            parts = tuple(part for part, selected in
+                          zip((_LOWER_B, _UPPER_B, _DIGIT_B, _SYMBOL_B), selection) if selected)
+            pool = (*_make_table(b''.join(parts)), parts) if parts else None
+            self._pools[selection] = pool
+        return pool
+    
     def generate_password(self):
-        lowercase = string.ascii_lowercase if self.lower_var.get() else ''
-        uppercase = string.ascii_uppercase if self.upper_var.get() else ''
-        digits = string.digits if self.digits_var.get() else ''
-        symbols = '!@#$%^&*()_+-=[]{}|;:,.<>?' if self.symbols_var.get() else ''
-        
-        characters = lowercase + uppercase + digits + symbols
+        pool = self._pool_for((self.lower_var.get(), self.upper_var.get(),
+                              self.digits_var.get(), self.symbols_var.get()))
         
-        if not characters:
+        if pool is None:
             messagebox.showerror("Error", "Please select at least one character type")
             return
         
-        password = ''.join(random.choice(characters) for _ in range(self.length_var.get()))
+        password = _random_password(*pool, self.length_var.get())
         self.password_var.set(password)
     
     def copy_to_clipboard(self):
@@ -0,0 +1,165 @@
+import math
+import unittest
+
+from Calculator import SafeEval, np
+
+# Expressions over x and y that every engine supports
+EXPRESSIONS = [
+    "x + y * 2",
+    "(x - y) ** 2 / 7",
+    "x // y + x % y",
+    "-x + +y",
+    "sqrt(x) * 10 + pi",
+    "sin(x) + cos(y) + tan(1)",
+    "log(x) + log(x, 2) + log10(y) + exp(1)",
+    "abs(y - x) + round(x / y)",
+    "pow(x, 2) + max(x, y, 3) + min(x, y)",
+    "x < y",
+    "x < y < 10",
+    "x == 3 or y == 3",
+    "x > 0 and y > 0",
+    "x if x > y else y",
+    "e * tau",
+    "(-2) ** 2",
+    "(-x) ** 2",
+    "x ** -1",
+]
+
+ENV = {"x": 3, "y": 4}
+
+
+def _same(a, b):
+    if isinstance(a, bool) or isinstance(b, bool):
+        return bool(a) == bool(b)
+    return math.isclose(a, b, rel_tol=1e-12)
+
+
+class EnginesAgreeTest(unittest.TestCase):
+    def test_compile_run_and_jit_match_eval(self):
+        evaluator = SafeEval(ENV)
+        names = tuple(ENV)
+        for expr in EXPRESSIONS:
+            with self.subTest(expr=expr):
+                expected = evaluator.eval(expr)
+                self.assertTrue(_same(expected, evaluator.run(evaluator.compile(expr))))
+                self.assertTrue(_same(expected, evaluator.jit(expr, names)(*ENV.values())))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_vectorized_matches_eval(self):
+        evaluator = SafeEval()
+        xs = np.array([1, 3, 5])
+        ys = np.array([4, 4, 2])
+        for expr in EXPRESSIONS:
+            with self.subTest(expr=expr):
+                result = evaluator.eval_vectorized(expr, {"x": xs, "y": ys})
+                for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+                    expected = SafeEval({"x": x, "y": y}).eval(expr)
+                    self.assertEqual(result.shape, xs.shape)
+                    self.assertTrue(_same(expected, result[i].item()))
+
+    def test_statement_errors_match(self):
+        evaluator = SafeEval()
+        for expr in ("1 +", "a = b = 1", "x[0] = 1", "import os"):
+            with self.subTest(expr=expr):
+                with self.assertRaises(ValueError) as expected:
+                    evaluator.eval(expr)
+                with self.assertRaisesRegex(ValueError, expected.exception.args[0]):
+                    evaluator.compile(expr)
+                if np is not None:
+                    with self.assertRaisesRegex(ValueError, expected.exception.args[0]):
+                        evaluator.eval_vectorized(expr, {})
+
+    def test_dunder_names_rejected(self):
+        evaluator = SafeEval()
+        for expr in ("__builtins__", "__x = 1", "sqrt(__builtins__)"):
+            with self.subTest(expr=expr):
+                with self.assertRaisesRegex(ValueError, "Invalid variable name: __"):
+                    evaluator.eval(expr)
+                with self.assertRaisesRegex(ValueError, "Invalid variable name: __"):
+                    evaluator.compile(expr)
+
+
+class CompileTest(unittest.TestCase):
+    def test_program_holds_only_what_the_bytecode_uses(self):
+        program = SafeEval().compile("sqrt(4) + (x if 1 else y + pi) + sqrt(x)")
+        self.assertEqual(program.names, ["x"])
+        self.assertEqual(len(program.calls), 1)
+        self.assertEqual(SafeEval({"x": 4}).run(program), 8.0)
+
+    def test_skipped_branch_still_validated(self):
+        with self.assertRaises(ValueError):
+            SafeEval().compile("1 if True else 'a'")
+
+
+class JitTest(unittest.TestCase):
+    def test_duplicate_variable_names_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Duplicate variable name: x"):
+            SafeEval().jit("x + y", ("x", "y", "x"))
+
+    def test_infinity_survives(self):
+        self.assertEqual(SafeEval().jit("-1e999 + x", ("x",))(1), -math.inf)
+
+
+class BoolOpFoldingTest(unittest.TestCase):
+    def test_operands_before_absorbing_literal_are_evaluated(self):
+        evaluator = SafeEval()
+        for expr in ("u and False", "u or True", "sqrt(-1) and False"):
+            with self.subTest(expr=expr):
+                with self.assertRaises(ValueError):
+                    evaluator.eval(expr)
+                with self.assertRaises(ValueError):
+                    evaluator.run(evaluator.compile(expr))
+
+    def test_leading_absorbing_literal_short_circuits(self):
+        self.assertIs(SafeEval().eval("False and u"), False)
+        self.assertIs(SafeEval().eval("True or u"), True)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_vectorized_keeps_array_shape(self):
+        for expr in ("x and False", "False and x", "pi"):
+            with self.subTest(expr=expr):
+                result = SafeEval().eval_vectorized(expr, {"x": np.array([1, 0, 2])})
+                self.assertEqual(result.tolist(), [SafeEval({"x": x}).eval(expr) for x in (1, 0, 2)])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_vectorized_tuple_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Tuple results cannot be vectorized"):
+            SafeEval().eval_vectorized("(x, 2)", {"x": np.array([1, 2])})
+
+
+class PowerTest(unittest.TestCase):
+    def test_square_and_cube_match_eval(self):
+        for value in (7, -3, 1.1, 2.5e-3, True):
+            evaluator = SafeEval({"x": value})
+            for expr in ("x ** 2", "x ** 3"):
+                with self.subTest(value=value, expr=expr):
+                    self.assertEqual(evaluator.run(evaluator.compile(expr)), evaluator.eval(expr))
+
+    def test_float_overflow_raises(self):
+        evaluator = SafeEval({"x": 1e200})
+        for expr in ("x ** 2", "x ** 3"):
+            with self.subTest(expr=expr):
+                with self.assertRaises(OverflowError):
+                    evaluator.run(evaluator.compile(expr))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_vectorized_pow_with_modulus(self):
+        result = SafeEval().eval_vectorized("pow(x, 3, 5)", {"x": np.array([2, 3, 4])})
+        self.assertEqual(result.tolist(), [pow(2, 3, 5), pow(3, 3, 5), pow(4, 3, 5)])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_vectorized_negative_integer_exponent(self):
+        evaluator = SafeEval()
+        for expr in ("x ** -1", "pow(x, -2)"):
+            with self.subTest(expr=expr):
+                result = evaluator.eval_vectorized(expr, {"x": np.array([2, 4])})
+                self.assertEqual(result.tolist(), [SafeEval({"x": x}).eval(expr) for x in (2, 4)])
+
+
+class DepthTest(unittest.TestCase):
+    def test_long_sum(self):
+        self.assertEqual(SafeEval({"x": 1}).eval("+".join(["x"] * 900)), 900)
+
+
+if __name__ == "__main__":
+    unittest.main()
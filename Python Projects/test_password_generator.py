@@ -0,0 +1,56 @@
+import itertools
+import sys
+import types
+import unittest
+
+# The helpers under test need neither the clipboard nor a display
+for _name in ("pyperclip", "tkinter"):
+    try:
+        __import__(_name)
+    except ImportError:
+        sys.modules[_name] = types.ModuleType(_name)
+        if _name == "tkinter":
+            sys.modules[_name].ttk = sys.modules[_name].messagebox = None
+
+from PasswordGenerator import (_DIGIT_B, _LOWER_B, _SYMBOL_B, _UPPER_B,
+                               _make_table, _random_password)
+
+PARTS = (_LOWER_B, _UPPER_B, _DIGIT_B, _SYMBOL_B)
+SELECTIONS = [selection for selection in itertools.product((False, True), repeat=4) if any(selection)]
+
+
+def _parts_for(selection):
+    return tuple(part for part, selected in zip(PARTS, selection) if selected)
+
+
+class MakeTableTest(unittest.TestCase):
+    def test_rejects_the_biased_tail(self):
+        for selection in SELECTIONS:
+            pool = b''.join(_parts_for(selection))
+            with self.subTest(pool=pool):
+                table, reject = _make_table(pool)
+                self.assertEqual(len(reject), 256 % len(pool))
+                self.assertEqual(reject, bytes(range(256 - len(reject), 256)))
+                # The bytes that survive map onto each pool character equally often
+                kept = bytes(range(256)).translate(table, reject)
+                self.assertEqual(sorted(kept), sorted(pool * (len(kept) // len(pool))))
+
+
+class RandomPasswordTest(unittest.TestCase):
+    def test_every_selected_type_appears(self):
+        for selection in SELECTIONS:
+            parts = _parts_for(selection)
+            pool = b''.join(parts)
+            table, reject = _make_table(pool)
+            for length in (len(parts), 12):
+                with self.subTest(selection=selection, length=length):
+                    for _ in range(50):
+                        password = _random_password(table, reject, parts, length).encode('ascii')
+                        self.assertEqual(len(password), length)
+                        self.assertLessEqual(set(password), set(pool))
+                        for part in parts:
+                            self.assertTrue(set(password) & set(part))
+
+
+if __name__ == "__main__":
+    unittest.main()